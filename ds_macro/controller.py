@@ -4,8 +4,9 @@ import subprocess
 import time
 import math
 import json
-from contextlib import contextmanager
-from typing import Dict, List, Optional, Set, Tuple, Union, Any, Callable
+from enum import Enum
+from sys import intern
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union, Any, Callable
 from subprocess import CalledProcessError
 
 from .models import (
@@ -34,26 +35,106 @@ from .exceptions import (
 logger = logging.getLogger(__name__)
 
 
+def _merge_consecutive_waits(actions: List[InputAction]) -> List[InputAction]:
+    """Merge back-to-back wait actions into a single wait of the combined duration"""
+    merged: List[InputAction] = []
+    for action in actions:
+        if action.type == "wait" and merged and merged[-1].type == "wait":
+            merged[-1] = Wait(duration=merged[-1].duration + action.duration)
+        else:
+            merged.append(action)
+    return merged
+
+
+def _fuse_sequential(sequences: List[ActionSequence]) -> List[ActionSequence]:
+    """Join runs of sequential sequences into one; parallel ones stay boundaries"""
+    fused: List[ActionSequence] = []
+    for sequence in sequences:
+        if fused and not fused[-1].parallel and not sequence.parallel:
+            actions = _merge_consecutive_waits(fused[-1].actions + sequence.actions)
+            fused[-1] = ActionSequence(actions=actions, parallel=False)
+        else:
+            fused.append(sequence)
+    return fused
+
+
+def _key_name(key: str) -> str:
+    """Intern a key name so pressed-key set lookups can match by identity"""
+    if isinstance(key, Enum):
+        key = key.value
+    # Leave anything else for pydantic to reject
+    return intern(key) if isinstance(key, str) else key
+
+
+# Defaults shared by the ActionGroup builders and from_tuples
+_TAP_DURATION = 0.1
+_TURN_DURATION = 1.0
+_MOUSE_DURATION = 0.1
+
+# Unvalidated constructors for ActionGroup.from_tuples, keyed by action type.
+# They normalize their inputs the way validation would for the fluent builders.
+_CONSTRUCTORS: Dict[str, Callable[..., InputAction]] = {
+    "press": lambda key: KeyPress.model_construct(key=_key_name(key)),
+    "release": lambda key: KeyRelease.model_construct(key=_key_name(key)),
+    "tap": lambda key, duration=_TAP_DURATION: KeyTap.model_construct(
+        key=_key_name(key), duration=float(duration)
+    ),
+    "wait": lambda duration: Wait.model_construct(duration=float(duration)),
+    "turn": lambda degrees, duration=_TURN_DURATION: Turn.model_construct(
+        degrees=float(degrees), duration=float(duration)
+    ),
+    "mouse_move": lambda dx, dy=0, duration=_MOUSE_DURATION: MouseMove.model_construct(
+        dx=float(dx), dy=float(dy), duration=float(duration)
+    ),
+    "mouse_press": lambda button: MousePress.model_construct(
+        button=MouseButton(button)
+    ),
+    "mouse_release": lambda button: MouseRelease.model_construct(
+        button=MouseButton(button)
+    ),
+    "mouse_click": lambda button, duration=_MOUSE_DURATION: MouseClick.model_construct(
+        button=MouseButton(button), duration=float(duration)
+    ),
+}
+
+
 class ActionGroup:
     """A group of actions that can be executed together"""
 
+    __slots__ = ("actions", "parallel")
+
     def __init__(self, parallel: bool = True):
         self.actions: List[InputAction] = []
         self.parallel = parallel
 
+    @classmethod
+    def from_tuples(cls, items: Sequence[Tuple], parallel: bool = True):
+        """Build a group from trusted (type, *args) tuples without validation
+
+        For example ``[("press", "w"), ("wait", 1.0), ("release", "w")]``.
+        """
+        group = cls(parallel)
+        for kind, *args in items:
+            try:
+                construct = _CONSTRUCTORS[kind]
+            except KeyError:
+                raise ValueError(f"Unknown action type: {kind!r}") from None
+            group.actions.append(construct(*args))
+        return group
+
     def press(self, key: str):
         """Press a key and hold it"""
-        self.actions.append(KeyPress(key=key))
+        self.actions.append(KeyPress(key=_key_name(key)))
         return self
 
     def release(self, key: str):
         """Release a previously pressed key"""
-        self.actions.append(KeyRelease(key=key))
+        self.actions.append(KeyRelease(key=_key_name(key)))
         return self
 
-    def tap(self, key: str, duration: float = 0.1):
+    def tap(self, key: str, duration: float = _TAP_DURATION):
         """Tap a key (press and release)"""
-        self.actions.append(KeyTap(key=key, duration=duration))
+        self.actions.append(KeyTap(key=_key_name(key), duration=duration))
         return self
 
     def wait(self, duration: float):
@@ -61,12 +142,12 @@ class ActionGroup:
         self.actions.append(Wait(duration=duration))
         return self
 
-    def turn(self, degrees: float, duration: float = 1.0):
+    def turn(self, degrees: float, duration: float = _TURN_DURATION):
         """Turn camera by specified degrees"""
         self.actions.append(Turn(degrees=degrees, duration=duration))
         return self
 
-    def mouse_move(self, dx: float, dy: float = 0, duration: float = 0.1):
+    def mouse_move(self, dx: float, dy: float = 0, duration: float = _MOUSE_DURATION):
         """Move mouse by relative amount"""
         self.actions.append(MouseMove(dx=dx, dy=dy, duration=duration))
         return self
@@ -81,15 +162,47 @@ class ActionGroup:
         self.actions.append(MouseRelease(button=button))
         return self
 
-    def mouse_click(self, button: MouseButton, duration: float = 0.1):
+    def mouse_click(self, button: MouseButton, duration: float = _MOUSE_DURATION):
         """Click a mouse button (press and release)"""
         self.actions.append(MouseClick(button=button, duration=duration))
         return self
 
 
+class _GroupContext:
+    """Hands out an ActionGroup and adds it to the routine on a clean exit"""
+
+    __slots__ = ("routine", "group")
+
+    def __init__(self, routine: "Routine", parallel: bool):
+        self.routine = routine
+        self.group = ActionGroup(parallel=parallel)
+
+    def __enter__(self) -> ActionGroup:
+        return self.group
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # A group whose body raised is dropped, as with the old generator
+        if exc_type is None:
+            self.routine._add_group(self.group)
+        return False
+
+
 class Routine:
     """A collection of action sequences to be executed"""
 
+    __slots__ = (
+        "controller",
+        "id",
+        "name",
+        "categories",
+        "sequences",
+        "_plan",
+        "_cancelled",
+        "_task",
+        "_held_keys",
+        "_held_buttons",
+    )
+
     def __init__(
         self,
         controller: "DSController",
@@ -102,34 +215,121 @@ class Routine:
         self.name = name
         self.categories = categories or []
         self.sequences: List[ActionSequence] = []
+        self._plan: Optional[List[ActionSequence]] = None
         self._cancelled = False
         self._task = None
+        # Inputs pressed by this routine's completed steps and still held
+        self._held_keys: Set[str] = set()
+        self._held_buttons: Set[MouseButton] = set()
 
-    @contextmanager
-    def parallel_actions(self):
+    def parallel_actions(self) -> "_GroupContext":
         """Create a group of parallel actions using a context manager"""
-        group = ActionGroup(parallel=True)
-        yield group
-        self.sequences.append(ActionSequence(actions=group.actions, parallel=True))
+        return _GroupContext(self, parallel=True)
 
-    @contextmanager
-    def sequential_actions(self):
+    def sequential_actions(self) -> "_GroupContext":
         """Create a group of sequential actions using a context manager"""
-        group = ActionGroup(parallel=False)
-        yield group
-        self.sequences.append(ActionSequence(actions=group.actions, parallel=False))
+        return _GroupContext(self, parallel=False)
 
-    def add_actions(self, actions: List[InputAction], parallel: bool = False):
-        """Add a list of predefined actions"""
-        self.sequences.append(ActionSequence(actions=actions, parallel=parallel))
+    def bulk_sequential(self, items: Sequence[Tuple]):
+        """Add a sequential group built from trusted (type, *args) tuples"""
+        self._add_group(ActionGroup.from_tuples(items, parallel=False))
         return self
 
+    def _add_group(self, group: ActionGroup) -> None:
+        """Append a finished action group as a sequence"""
+        actions = group.actions
+        if not group.parallel:
+            # Consecutive waits only delay the next action, so one timer is enough
+            actions = _merge_consecutive_waits(actions)
+        self.sequences.append(ActionSequence(actions=actions, parallel=group.parallel))
+        self._plan = None
+
+    def add_actions(self, actions: Sequence[InputAction], parallel: bool = False):
+        """Add a list or tuple of predefined actions"""
+        self.sequences.append(ActionSequence(actions=list(actions), parallel=parallel))
+        self._plan = None
+        return self
+
+    def compile(self) -> List[ActionSequence]:
+        """Build the execution plan once and reuse it until sequences are added
+
+        Sequences must be added through the builder methods for the cached plan
+        to be invalidated.
+        """
+        if self._plan is None:
+            # Back-to-back sequential sequences run as one, saving a scheduler trip
+            self._plan = _fuse_sequential(self.sequences)
+        return self._plan
+
     def cancel(self):
-        """Cancel this routine"""
+        """Cancel this routine, interrupting the step it is running"""
         logger.info(f"Cancelling routine: {self.name or f'id={self.id}'}")
-        self._cancelled = True
-        if self._task:
+        if self._task and not self._cancelled:
             self._task.cancel()
+        self._cancelled = True
+
+    async def _run_step(self, step: ActionSequence) -> bool:
+        """Execute a plan step, stopping as soon as the routine is cancelled
+
+        Returns False if the step was interrupted by cancel().
+        """
+        controller = self.controller
+        keys_before = set(controller.pressed_keys)
+        buttons_before = set(controller.pressed_mouse_buttons)
+        try:
+            await controller.execute_sequence(step)
+        except asyncio.CancelledError:
+            self._track_held_inputs(step, keys_before, buttons_before)
+            await self._release_held_inputs()
+            if not self._cancelled:
+                # Cancelled from outside; let the caller see it
+                raise
+            asyncio.current_task().uncancel()
+            return False
+        self._track_held_inputs(step, keys_before, buttons_before)
+        return True
+
+    def _track_held_inputs(
+        self,
+        step: ActionSequence,
+        keys_before: Set[str],
+        buttons_before: Set[MouseButton],
+    ) -> None:
+        """Update the inputs this routine has pressed and not yet released
+
+        Only inputs a step's own actions pressed since it started count, so
+        inputs held by other routines are never claimed.
+        """
+        pressed_keys = self.controller.pressed_keys
+        pressed_buttons = self.controller.pressed_mouse_buttons
+        step_keys = {getattr(action, "key", None) for action in step.actions}
+        step_buttons = {getattr(action, "button", None) for action in step.actions}
+        self._held_keys = (self._held_keys & pressed_keys) | (
+            (pressed_keys - keys_before) & step_keys
+        )
+        self._held_buttons = (self._held_buttons & pressed_buttons) | (
+            (pressed_buttons - buttons_before) & step_buttons
+        )
+
+    async def _release_held_inputs(self) -> None:
+        """Release every input this routine pressed and has not released"""
+        controller = self.controller
+        for key in self._held_keys & controller.pressed_keys:
+            try:
+                await controller._release_key_safely(key)
+            except Exception as e:
+                logger.error("Error releasing key %s after cancel: %s", key, e)
+
+        for button in self._held_buttons & controller.pressed_mouse_buttons:
+            try:
+                await controller._release_mouse_safely(button)
+            except Exception as e:
+                logger.error(
+                    "Error releasing mouse button %s after cancel: %s", button, e
+                )
+
+        self._held_keys = set()
+        self._held_buttons = set()
 
     async def run(self):
         """Execute the entire routine"""
@@ -138,28 +338,38 @@ class Routine:
         if self.categories:
             logger.info(f"  Categories: {', '.join(self.categories)}")
 
+        # Compile before registering so a failure cannot leave a stale entry
+        plan = self.compile()
+
         # Register with controller's registry system
         self.controller._register_routine(self)
+        # cancel() interrupts a running step by cancelling this task
+        self._task = asyncio.current_task()
+        self._held_keys = set()
+        self._held_buttons = set()
 
         try:
-            for i, sequence in enumerate(self.sequences):
+            for i, step in enumerate(plan):
                 if self._cancelled:
                     logger.info(
                         f"Routine {routine_name} was cancelled, stopping execution"
                     )
+                    await self._release_held_inputs()
                     break
 
-                if sequence.parallel:
-                    action_count = len(sequence.actions)
+                if step.parallel:
+                    action_count = len(step.actions)
                     logger.info(
                         f"Executing parallel sequence with {action_count} actions"
                     )
                 else:
+                    logger.info(f"Executing sequential sequence {i+1}/{len(plan)}")
+
+                if not await self._run_step(step):
                     logger.info(
-                        f"Executing sequential sequence {i+1}/{len(self.sequences)}"
+                        f"Routine {routine_name} was cancelled, stopping execution"
                     )
-
-                await self.controller.execute_sequence(sequence)
+                    break
 
             logger.info(f"Completed routine: {routine_name}")
         except Exception as e:
@@ -167,6 +377,7 @@ class Routine:
             raise
         finally:
             # Unregister from controller when done
+            self._task = None
             self.controller._unregister_routine(self)
 
 
@@ -244,6 +455,34 @@ class DSController:
         logger.info(f"Created routine: {name or f'id={routine_id}'}")
         return routine
 
+    async def run_routines(self, *routines: Routine) -> List[Any]:
+        """Run independent routines concurrently
+
+        The routines must hold disjoint keys and mouse buttons, otherwise one
+        may release an input another still needs; run overlapping routines
+        one after another instead. Errors are logged and returned in place of
+        results rather than stopping the other routines; a failed routine may
+        leave inputs held, see emergency_stop().
+        """
+        results = await asyncio.gather(
+            *(routine.run() for routine in routines), return_exceptions=True
+        )
+        failed = False
+        for routine, result in zip(routines, results):
+            if isinstance(result, BaseException):
+                failed = True
+                logger.error(
+                    "Routine %s failed: %r", routine.name or f"id={routine.id}", result
+                )
+        held = self.pressed_keys or self.pressed_mouse_buttons
+        if failed and held and logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Inputs still held after failed routines: keys %s, mouse buttons %s",
+                sorted(self.pressed_keys),
+                sorted(button.value for button in self.pressed_mouse_buttons),
+            )
+        return results
+
     def _register_routine(self, routine: Routine) -> None:
         """Register routine in global registry"""
         self._id_to_routine[routine.id] = routine
@@ -436,7 +675,6 @@ class DSController:
 
     async def _execute_action(self, action: InputAction) -> None:
         """Execute a single action based on its type"""
-        action_details = action.model_dump()
         log_action = f"{action.type}"
         if hasattr(action, "key") and action.key:
             log_action += f" key='{action.key}'"
@@ -1,5 +1,5 @@
 # models.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional, Set, Union
 from enum import Enum
 
@@ -46,6 +46,9 @@ class RoutineCategory(str, Enum):
 class InputAction(BaseModel):
     """Base class for all input actions"""
 
+    # Actions are shared between routines and cached patterns, so never mutated
+    model_config = ConfigDict(frozen=True)
+
     type: str
     duration: Optional[float] = None
 
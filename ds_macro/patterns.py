@@ -1,5 +1,6 @@
 # patterns.py
-from typing import List
+import functools
+from typing import Tuple
 from .models import (
     InputAction,
     KeyMapping,
@@ -17,55 +18,64 @@ from .models import (
 
 
 class CommonActions:
+    """Factories for common action patterns
+
+    Every factory returns a tuple of frozen actions. Some results are cached
+    and shared between callers, so build new actions rather than editing them.
+    """
+
     @staticmethod
-    def sprint_forward(duration: float) -> List[InputAction]:
+    def sprint_forward(duration: float) -> Tuple[InputAction, ...]:
         """Sprint forward for the specified duration"""
-        return [
+        return (
             KeyPress(key=MovementDirection.FORWARD),
             KeyPress(key="sprint"),
             Wait(duration=duration),
             KeyRelease(key="sprint"),
             KeyRelease(key=MovementDirection.FORWARD),
-        ]
+        )
 
     @staticmethod
-    def scan_environment() -> List[InputAction]:
-        """Perform an environmental scan in the forward direction"""
-        return [
+    @functools.lru_cache(maxsize=None)
+    def scan_environment() -> Tuple[InputAction, ...]:
+        """Perform an environmental scan in the forward direction (cached)"""
+        return (
             KeyPress(key="scan"),
             KeyRelease(key="scan"),
-        ]
+        )
 
     @staticmethod
-    def strafe_left(duration: float) -> List[InputAction]:
+    def strafe_left(duration: float) -> Tuple[InputAction, ...]:
         """Strafe left for the specified duration"""
-        return [
+        return (
             KeyPress(key=MovementDirection.LEFT),
             Wait(duration=duration),
             KeyRelease(key=MovementDirection.LEFT),
-        ]
+        )
 
     @staticmethod
-    def strafe_right(duration: float) -> List[InputAction]:
+    def strafe_right(duration: float) -> Tuple[InputAction, ...]:
         """Strafe right for the specified duration"""
-        return [
+        return (
             KeyPress(key=MovementDirection.RIGHT),
             Wait(duration=duration),
             KeyRelease(key=MovementDirection.RIGHT),
-        ]
+        )
 
     @staticmethod
-    def backstep(duration: float) -> List[InputAction]:
-        """Step backward for the specified duration"""
-        return [
+    @functools.lru_cache(maxsize=None)
+    def backstep(duration: float) -> Tuple[InputAction, ...]:
+        """Step backward for the specified duration (cached per duration)"""
+        return (
             KeyPress(key=MovementDirection.BACKWARD),
             Wait(duration=duration),
             KeyRelease(key=MovementDirection.BACKWARD),
-        ]
+        )
 
     @staticmethod
-    def aim_and_fire(shots: int = 1, delay: float = 0.2) -> List[InputAction]:
-        """Aim down sights and fire a specified number of shots"""
+    @functools.lru_cache(maxsize=None)
+    def aim_and_fire(shots: int = 1, delay: float = 0.2) -> Tuple[InputAction, ...]:
+        """Aim down sights and fire a specified number of shots (cached per args)"""
         actions = [MousePress(button=MouseButton.RIGHT)]  # Aim
 
         for i in range(shots):
@@ -74,34 +84,34 @@ class CommonActions:
                 actions.append(Wait(duration=delay))
 
         actions.append(MouseRelease(button=MouseButton.RIGHT))  # Release aim
-        return actions
+        return tuple(actions)
 
     @staticmethod
-    def crouch_toggle() -> List[InputAction]:
+    def crouch_toggle() -> Tuple[InputAction, ...]:
         """Toggle crouch state"""
-        return [KeyTap(key="crouch", duration=0.1)]
+        return (KeyTap(key="crouch", duration=0.1),)
 
     @staticmethod
-    def jump() -> List[InputAction]:
+    def jump() -> Tuple[InputAction, ...]:
         """Perform a jump"""
-        return [KeyTap(key="jump", duration=0.1)]
+        return (KeyTap(key="jump", duration=0.1),)
 
     @staticmethod
-    def reload() -> List[InputAction]:
+    def reload() -> Tuple[InputAction, ...]:
         """Reload current weapon"""
-        return [KeyTap(key="reload", duration=0.1)]
+        return (KeyTap(key="reload", duration=0.1),)
 
     @staticmethod
-    def interact() -> List[InputAction]:
+    def interact() -> Tuple[InputAction, ...]:
         """Interact with object in front of player"""
-        return [KeyTap(key="action", duration=0.5)]
+        return (KeyTap(key="action", duration=0.5),)
 
     @staticmethod
-    def open_inventory() -> List[InputAction]:
+    def open_inventory() -> Tuple[InputAction, ...]:
         """Open inventory menu"""
-        return [KeyTap(key="cargo", duration=0.1)]
+        return (KeyTap(key="cargo", duration=0.1),)
 
     @staticmethod
-    def close_menu() -> List[InputAction]:
+    def close_menu() -> Tuple[InputAction, ...]:
         """Close current menu"""
-        return [KeyTap(key="esc", duration=0.1)]
+        return (KeyTap(key="esc", duration=0.1),)
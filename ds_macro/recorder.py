@@ -1,11 +1,11 @@
 # recorder.py
 import logging
 import time
-from typing import List, Optional, Dict, Set
+from typing import Callable, List, Optional, Dict, Set
 from pydantic import BaseModel
 from pynput import mouse, keyboard
 
-from models import (
+from .models import (
     Action,
     ActionType,
     Routine,
@@ -28,9 +28,14 @@ class RecorderConfig(BaseModel):
 
 
 class InputRecorder:
-    def __init__(self, config: Optional[RecorderConfig] = None):
-        """Initialize recorder with optional custom configuration"""
+    def __init__(
+        self,
+        config: Optional[RecorderConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize recorder with optional custom configuration and time source"""
         self.config = config or RecorderConfig()
+        self._clock = clock
         self.actions: List[Action] = []
         self.start_time: Optional[float] = None
         self.last_action_time: Optional[float] = None
@@ -103,7 +108,7 @@ class InputRecorder:
 
     def _get_time_since_last(self) -> float:
         """Get time since last action, updating last_action_time"""
-        current_time = time.time()
+        current_time = self._clock()
         if self.last_action_time is None:
             duration = 0.0
         else:
@@ -403,7 +408,7 @@ class InputRecorder:
         """Start recording inputs"""
         logger.info("Starting input recording...")
         self.actions = []
-        self.start_time = time.time()
+        self.start_time = self._clock()
         self.last_action_time = self.start_time
         self.last_mouse_pos = None
         self.pressed_keys.clear()
@@ -470,6 +475,11 @@ class InputRecorder:
         
         return routine
 
+    def reset(self) -> None:
+        """Return to the idle state with nothing recorded"""
+        self.discard_recording()
+        self.is_recording = False
+
     def discard_recording(self) -> None:
         """Discard current recording"""
         logger.info("Discarding recording...")
@@ -1,21 +1,28 @@
 # routines.py
-from typing import Dict, List, Optional, Callable
-import asyncio
+from typing import TYPE_CHECKING
+from functools import partial
+from types import MappingProxyType
 import logging
 from ds_macro.models import (
+    KeyPress,
+    KeyRelease,
     MouseButton,
     MovementDirection,
+    Turn,
+    Wait,
     Routine as LegacyRoutine,
     ActionType,
     Action as LegacyAction,
 )
 from ds_macro.patterns import CommonActions
-from ds_macro.controller import DSController
+
+if TYPE_CHECKING:
+    from ds_macro.controller import DSController
 
 logger = logging.getLogger(__name__)
 
 
-async def create_360_scan(controller: DSController) -> None:
+async def create_360_scan(controller: "DSController") -> None:
     """Creates a routine that performs a full 360° scan"""
     routine = controller.create_routine(name="360_degree_scan", categories=["scanning"])
 
@@ -25,34 +32,30 @@ async def create_360_scan(controller: DSController) -> None:
     await routine.run()
 
 
-async def create_patrol_route(controller: DSController) -> None:
+async def create_patrol_route(controller: "DSController") -> None:
     """Creates a patrol route that walks in a square pattern"""
     routine = controller.create_routine(
         name="patrol_square", categories=["movement", "patrol"]
     )
 
-    # Start with a scan
-    routine.add_actions(CommonActions.scan_environment())
-
-    # Execute a square patrol pattern
-    for i in range(4):
-        # Walk forward
-        with routine.sequential_actions() as actions:
-            actions.press(MovementDirection.FORWARD)
-            actions.wait(3.0)
-            actions.release(MovementDirection.FORWARD)
+    scan = CommonActions.scan_environment()
 
-        # Turn right
-        with routine.sequential_actions() as actions:
-            actions.turn(90, duration=1.0)
+    # Walk forward, turn right and scan at each corner
+    corner = (
+        KeyPress(key=MovementDirection.FORWARD),
+        Wait(duration=3.0),
+        KeyRelease(key=MovementDirection.FORWARD),
+        Turn(degrees=90, duration=1.0),
+        *scan,
+    )
 
-        # Scan after each corner
-        routine.add_actions(CommonActions.scan_environment())
+    # Start with a scan, then execute the square as one flat sequence
+    routine.add_actions(scan + corner * 4)
 
     await routine.run()
 
 
-async def create_cargo_delivery(controller: DSController) -> None:
+async def create_cargo_delivery(controller: "DSController") -> None:
     """Creates a routine for delivering cargo"""
     routine = controller.create_routine(
         name="deliver_cargo", categories=["interaction"]
@@ -80,7 +83,7 @@ async def create_cargo_delivery(controller: DSController) -> None:
     await routine.run()
 
 
-async def create_combat_sequence(controller: DSController) -> None:
+async def create_combat_sequence(controller: "DSController") -> None:
     """Creates a combat sequence with aiming and shooting"""
     routine = controller.create_routine(name="combat_sequence", categories=["combat"])
 
@@ -179,129 +182,44 @@ def create_cargo_delivery_legacy() -> LegacyRoutine:
     )
 
 
-# Add these new functions to ds_macro/routines.py
-
-
-async def create_balance_left(controller: DSController) -> None:
-    """Creates a routine that holds left mouse button to center balance left"""
-    routine = controller.create_routine(
-        name="balance_left", categories=["movement", "balance"]
-    )
-
-    # Hold left mouse button
-    with routine.sequential_actions() as actions:
-        actions.mouse_press(MouseButton.LEFT)
-        actions.wait(2.0)  # Hold for 2 seconds by default
-        actions.mouse_release(MouseButton.LEFT)
-
-    await routine.run()
-
-
-async def create_balance_right(controller: DSController) -> None:
-    """Creates a routine that holds right mouse button to center balance right"""
-    routine = controller.create_routine(
-        name="balance_right", categories=["movement", "balance"]
-    )
-
-    # Hold right mouse button
-    with routine.sequential_actions() as actions:
-        actions.mouse_press(MouseButton.RIGHT)
-        actions.wait(2.0)  # Hold for 2 seconds by default
-        actions.mouse_release(MouseButton.RIGHT)
-
-    await routine.run()
-
-
-async def create_balance_both(controller: DSController) -> None:
-    """Creates a routine that holds both mouse buttons to fully center balance"""
-    routine = controller.create_routine(
-        name="balance_both", categories=["movement", "balance"]
-    )
-
-    # Hold both mouse buttons simultaneously
-    with routine.parallel_actions() as actions:
-        actions.mouse_press(MouseButton.LEFT)
-        actions.mouse_press(MouseButton.RIGHT)
-
-    # Wait while holding
-    with routine.sequential_actions() as actions:
-        actions.wait(2.0)  # Hold for 2 seconds by default
+async def create_balance(
+    controller: "DSController", *, left: bool, right: bool, moving: bool
+) -> None:
+    """Creates a routine that holds mouse buttons to center balance
 
-    # Release both buttons
-    with routine.sequential_actions() as actions:
-        actions.mouse_release(MouseButton.LEFT)
-        actions.mouse_release(MouseButton.RIGHT)
+    Holding left or right centers balance to that side, holding both fully
+    centers it. When moving, the player walks forward while balancing.
+    """
+    if not (left or right):
+        raise ValueError("Balance routine needs at least one mouse button")
 
-    await routine.run()
+    side = "both" if left and right else "left" if left else "right"
+    name = f"balance_{side}_moving" if moving else f"balance_{side}"
+    routine = controller.create_routine(name=name, categories=["movement", "balance"])
 
+    buttons = [
+        button
+        for button, held in ((MouseButton.LEFT, left), (MouseButton.RIGHT, right))
+        if held
+    ]
 
-async def create_balance_left_moving(controller: DSController) -> None:
-    """Creates a routine that holds left mouse button while moving forward"""
-    routine = controller.create_routine(
-        name="balance_left_moving", categories=["movement", "balance"]
-    )
-
-    # Start moving forward and balance left simultaneously
+    # Start moving and balancing simultaneously
     with routine.parallel_actions() as actions:
-        actions.press(MovementDirection.FORWARD)
-        actions.mouse_press(MouseButton.LEFT)
-
-    # Keep moving and balancing
-    with routine.sequential_actions() as actions:
-        actions.wait(5.0)  # Move and balance for 5 seconds
-
-    # Stop moving and balancing
-    with routine.sequential_actions() as actions:
-        actions.release(MovementDirection.FORWARD)
-        actions.mouse_release(MouseButton.LEFT)
-
-    await routine.run()
-
-
-async def create_balance_right_moving(controller: DSController) -> None:
-    """Creates a routine that holds right mouse button while moving forward"""
-    routine = controller.create_routine(
-        name="balance_right_moving", categories=["movement", "balance"]
-    )
-
-    # Start moving forward and balance right simultaneously
-    with routine.parallel_actions() as actions:
-        actions.press(MovementDirection.FORWARD)
-        actions.mouse_press(MouseButton.RIGHT)
-
-    # Keep moving and balancing
-    with routine.sequential_actions() as actions:
-        actions.wait(5.0)  # Move and balance for 5 seconds
-
-    # Stop moving and balancing
-    with routine.sequential_actions() as actions:
-        actions.release(MovementDirection.FORWARD)
-        actions.mouse_release(MouseButton.RIGHT)
-
-    await routine.run()
-
-
-async def create_balance_both_moving(controller: DSController) -> None:
-    """Creates a routine that holds both mouse buttons while moving forward"""
-    routine = controller.create_routine(
-        name="balance_both_moving", categories=["movement", "balance"]
-    )
-
-    # Start moving forward and balance both sides simultaneously
-    with routine.parallel_actions() as actions:
-        actions.press(MovementDirection.FORWARD)
-        actions.mouse_press(MouseButton.LEFT)
-        actions.mouse_press(MouseButton.RIGHT)
+        if moving:
+            actions.press(MovementDirection.FORWARD)
+        for button in buttons:
+            actions.mouse_press(button)
 
-    # Keep moving and balancing
+    # Keep holding (5 seconds while moving, 2 seconds standing still)
     with routine.sequential_actions() as actions:
-        actions.wait(5.0)  # Move and balance for 5 seconds
+        actions.wait(5.0 if moving else 2.0)
 
     # Stop moving and balancing
     with routine.sequential_actions() as actions:
-        actions.release(MovementDirection.FORWARD)
-        actions.mouse_release(MouseButton.LEFT)
-        actions.mouse_release(MouseButton.RIGHT)
+        if moving:
+            actions.release(MovementDirection.FORWARD)
+        for button in buttons:
+            actions.mouse_release(button)
 
     await routine.run()
 
@@ -314,28 +232,40 @@ LEGACY_ROUTINES = {
 }
 
 
-# Collection of available new routines
-AVAILABLE_ROUTINES = {
-    "360_scan": create_360_scan,
-    "patrol": create_patrol_route,
-    "deliver": create_cargo_delivery,
-    "combat": create_combat_sequence,
-    "balance_left": create_balance_left,
-    "balance_right": create_balance_right,
-    "balance_both": create_balance_both,
-    "balance_left_moving": create_balance_left_moving,
-    "balance_right_moving": create_balance_right_moving,
-    "balance_both_moving": create_balance_both_moving,
-}
+# Collection of available new routines (read-only view)
+AVAILABLE_ROUTINES = MappingProxyType(
+    {
+        "360_scan": create_360_scan,
+        "patrol": create_patrol_route,
+        "deliver": create_cargo_delivery,
+        "combat": create_combat_sequence,
+        "balance_left": partial(create_balance, left=True, right=False, moving=False),
+        "balance_right": partial(create_balance, left=False, right=True, moving=False),
+        "balance_both": partial(create_balance, left=True, right=True, moving=False),
+        "balance_left_moving": partial(
+            create_balance, left=True, right=False, moving=True
+        ),
+        "balance_right_moving": partial(
+            create_balance, left=False, right=True, moving=True
+        ),
+        "balance_both_moving": partial(
+            create_balance, left=True, right=True, moving=True
+        ),
+    }
+)
 
 
-async def run_routine(controller: DSController, routine_name: str) -> None:
+async def run_routine(controller: "DSController", routine_name: str) -> None:
     """Run a routine by name"""
-    if routine_name in AVAILABLE_ROUTINES:
-        await AVAILABLE_ROUTINES[routine_name](controller)
-    elif routine_name in LEGACY_ROUTINES:
-        logger.info(f"Using legacy routine: {routine_name}")
-        await controller.execute_routine(LEGACY_ROUTINES[routine_name])
+    routine_fn = AVAILABLE_ROUTINES.get(routine_name)
+    if routine_fn is not None:
+        await routine_fn(controller)
+        return
+
+    legacy_routine = LEGACY_ROUTINES.get(routine_name)
+    if legacy_routine is not None:
+        logger.info("Using legacy routine: %s", routine_name)
+        await controller.execute_routine(legacy_routine)
     else:
-        logger.error(f"Unknown routine: {routine_name}")
+        logger.error("Unknown routine: %s", routine_name)
         raise ValueError(f"Unknown routine: {routine_name}")
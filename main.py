@@ -6,21 +6,25 @@ from ds_macro.controller import DSController
 from ds_macro.routines import AVAILABLE_ROUTINES, run_routine
 from ds_macro.models import KeyMapping, MovementDirection, RoutineCategory
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
+
 
-# Create a handler for the latest log line
-latest_handler = logging.FileHandler("current_log.txt", mode="w")
-latest_handler.setLevel(logging.INFO)
-latest_handler.setFormatter(
-    logging.Formatter("%(message)s")
-)  # Only include the message
+def setup_logging() -> None:
+    """Configure console logging and the latest-log file handler"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
 
-# Add the handler to the root logger
-logging.root.addHandler(latest_handler)
+    # Create a handler for the latest log line
+    latest_handler = logging.FileHandler("current_log.txt", mode="w")
+    latest_handler.setLevel(logging.INFO)
+    latest_handler.setFormatter(
+        logging.Formatter("%(message)s")
+    )  # Only include the message
 
-logger = logging.getLogger(__name__)
+    # Add the handler to the root logger
+    logging.root.addHandler(latest_handler)
 
 
 async def main():
@@ -46,7 +50,7 @@ async def main():
     # Initialize controller
     ds = DSController()
 
-    logger.info(f"Starting Death Stranding controller in {args.delay} seconds...")
+    logger.info("Starting Death Stranding controller in %s seconds...", args.delay)
     await asyncio.sleep(args.delay)
 
     try:
@@ -59,7 +63,7 @@ async def main():
             await run_routine(ds, "patrol")
 
     except Exception as e:
-        logger.error(f"Controller error: {e}")
+        logger.error("Controller error: %s", e)
         # Emergency stop to release all keys
         await ds.emergency_stop()
         raise
@@ -120,4 +124,5 @@ async def run_custom_example(ds: DSController):
 
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
@@ -0,0 +1,53 @@
+import asyncio
+import copy
+import subprocess
+
+import pytest
+
+from ds_macro.controller import DSController
+
+# Output of a successful `xdotool getmouselocation` call
+_MOUSE_LOCATION = subprocess.CompletedProcess(
+    args=["xdotool", "getmouselocation"],
+    returncode=0,
+    stdout="x:0 y:0 screen:0 window:0\n",
+    stderr="",
+)
+
+
+def _fake_run(*args, **kwargs):
+    """Stand-in for subprocess.run that never reaches a real xdotool."""
+    return _MOUSE_LOCATION
+
+
+@pytest.fixture(autouse=True)
+def _no_xdotool(monkeypatch):
+    """Neutralize xdotool for every test; error-path tests override this."""
+    monkeypatch.setattr(subprocess, "run", _fake_run)
+
+
+@pytest.fixture(scope="session")
+def _base_controller():
+    """Build a single controller per session with a fixed mouse position."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(subprocess, "run", _fake_run)
+        return DSController()
+
+
+@pytest.fixture
+def controller(_base_controller):
+    """Hand out a shallow copy of the session controller with fresh state."""
+    controller = copy.copy(_base_controller)
+    controller.pressed_keys = set()
+    controller.pressed_mouse_buttons = set()
+    controller._routine_registry = {}
+    controller._id_to_routine = {}
+    controller._name_to_routines = {}
+    return controller
+
+
+@pytest.fixture(scope="session")
+def run_async():
+    """Run a coroutine to completion on one event loop shared by sync tests."""
+    with asyncio.Runner() as runner:
+        yield runner.run
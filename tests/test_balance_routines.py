@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from ds_macro.models import MouseButton, MovementDirection
+from ds_macro.controller import DSController
+from ds_macro.routines import AVAILABLE_ROUTINES, create_balance
+
+LEFT = MouseButton.LEFT
+RIGHT = MouseButton.RIGHT
+FWD = MovementDirection.FORWARD
+
+
+def _shape(sequences):
+    """Reduce sequences to (parallel, [(type, key/button/duration), ...]) tuples."""
+    return [
+        (
+            sequence.parallel,
+            [
+                (
+                    action.type,
+                    getattr(action, "button", None)
+                    or getattr(action, "key", None)
+                    or action.duration,
+                )
+                for action in sequence.actions
+            ],
+        )
+        for sequence in sequences
+    ]
+
+
+async def _collect_sequences(controller: DSController, routine_name: str):
+    """Run a registered routine and return the sequences it executed."""
+    sequences = []
+
+    async def record(sequence):
+        sequences.append(sequence)
+
+    # Instance attribute shadows the method; no xdotool calls are made
+    controller.execute_sequence = record
+    await AVAILABLE_ROUTINES[routine_name](controller)
+    return sequences
+
+
+@pytest.mark.parametrize(
+    "routine_name,held,moving",
+    [
+        ("balance_left", [LEFT], False),
+        ("balance_right", [RIGHT], False),
+        ("balance_both", [LEFT, RIGHT], False),
+        ("balance_left_moving", [LEFT], True),
+        ("balance_right_moving", [RIGHT], True),
+        ("balance_both_moving", [LEFT, RIGHT], True),
+    ],
+)
+def test_balance_routine_creation(controller, run_async, routine_name, held, moving):
+    """Test the press/hold/release structure of every registered balance routine."""
+    sequences = run_async(_collect_sequences(controller, routine_name))
+
+    walk = [("press", FWD)] if moving else []
+    stop = [("release", FWD)] if moving else []
+    # The hold and release groups are fused into one sequence at run time
+    assert _shape(sequences) == [
+        (True, walk + [("mouse_press", button) for button in held]),
+        (
+            False,
+            [("wait", 5.0 if moving else 2.0)]
+            + stop
+            + [("mouse_release", button) for button in held],
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "routine_name", [name for name in AVAILABLE_ROUTINES if name.startswith("balance")]
+)
+def test_balance_routine_cancelled_mid_hold_releases_inputs(
+    controller, run_async, routine_name
+):
+    """Test that cancelling during the hold releases what earlier steps pressed."""
+    # Held by another routine before this one starts
+    controller.pressed_keys.add("scan")
+
+    async def run_and_cancel():
+        task = asyncio.create_task(AVAILABLE_ROUTINES[routine_name](controller))
+        await asyncio.sleep(0.05)
+        assert controller.pressed_mouse_buttons
+        controller.cancel_category("balance")
+        await asyncio.wait_for(task, timeout=1.0)
+
+    run_async(run_and_cancel())
+
+    assert controller.pressed_keys == {"scan"}
+    assert controller.pressed_mouse_buttons == set()
+
+
+def test_balance_routine_requires_a_button(controller, run_async):
+    """Test that a balance routine without any mouse button is rejected."""
+    with pytest.raises(ValueError):
+        run_async(create_balance(controller, left=False, right=False, moving=True))
+
+
+def _build_balance(controller, name, buttons, duration=2.0, categories=("balance",)):
+    """Build a press/hold/release balance routine like create_balance does."""
+    routine = controller.create_routine(name=name, categories=list(categories))
+    with routine.parallel_actions() as actions:
+        for button in buttons:
+            actions.mouse_press(button)
+    with routine.sequential_actions() as actions:
+        actions.wait(duration)
+    with routine.sequential_actions() as actions:
+        for button in buttons:
+            actions.mouse_release(button)
+    return routine
+
+
+def test_integration_balance_routines(controller, run_async):
+    """Test running a balance routine end to end without xdotool."""
+    routine = _build_balance(
+        controller, "balance_integration_test", (LEFT, RIGHT), duration=0.05
+    )
+
+    run_async(routine.run())
+
+    # All buttons released and the routine removed from the registry
+    assert len(controller.pressed_mouse_buttons) == 0
+    assert routine.id not in controller._id_to_routine
+    assert "balance" not in controller._routine_registry
+
+
+def _make_balance(controller, i):
+    """Build and register a balance routine that holds the left mouse button."""
+    routine = _build_balance(
+        controller, f"balance_test_{i}", (LEFT,), categories=("balance", "test")
+    )
+    controller._register_routine(routine)
+    return routine
+
+
+@pytest.fixture
+def registered_balance_routines(controller, request):
+    """Registered balance routines; the count comes from indirect parametrization."""
+    return controller, [_make_balance(controller, i) for i in range(request.param)]
+
+
+@pytest.mark.parametrize("registered_balance_routines", [1, 3, 5], indirect=True)
+def test_multiple_balance_routines_cancellation(registered_balance_routines):
+    """Test cancelling several balance routines by category."""
+    controller, routines = registered_balance_routines
+
+    assert controller.cancel_category("balance") is True
+    assert all(routine._cancelled for routine in routines)
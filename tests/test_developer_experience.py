@@ -1,7 +1,9 @@
 import pytest
 import asyncio
-from typing import List, Optional, Set, Dict, Any
-from contextlib import contextmanager
+import weakref
+from typing import List, Set, Dict, Any, Tuple
+
+from ds_macro.controller import ActionGroup
 
 # Import models from the main codebase instead of defining them in the test file
 from ds_macro.models import (
@@ -23,81 +25,66 @@ from ds_macro.models import (
 
 # ============= Test implementation of the developer experience layer =============
 
+# id(action) -> (weak reference to the action, its model_dump() output)
+_DUMP_CACHE: Dict[int, Tuple[weakref.ref, Dict[str, Any]]] = {}
 
-class ActionGroup:
-    """A group of actions that can be executed together"""
 
-    def __init__(self, parallel: bool = True):
-        self.actions: List[InputAction] = []
-        self.parallel = parallel
+def _cached_dump(action: InputAction) -> Dict[str, Any]:
+    """model_dump() an action once and reuse the result while it is alive"""
+    key = id(action)
+    entry = _DUMP_CACHE.get(key)
+    if entry is not None and entry[0]() is action:
+        return entry[1]
 
-    def press(self, key: str):
-        """Press a key and hold it"""
-        self.actions.append(KeyPress(key=key))
-        return self
+    dumped = action.model_dump()
+    # Drop the entry when the action is garbage collected so ids can be reused
+    ref = weakref.ref(action, lambda _, key=key: _DUMP_CACHE.pop(key, None))
+    _DUMP_CACHE[key] = (ref, dumped)
+    return dumped
 
-    def release(self, key: str):
-        """Release a previously pressed key"""
-        self.actions.append(KeyRelease(key=key))
-        return self
 
-    def tap(self, key: str, duration: float = 0.1):
-        """Tap a key (press and release)"""
-        self.actions.append(KeyTap(key=key, duration=duration))
-        return self
+async def _tick():
+    """Yield to the event loop once without arming a timer"""
+    await asyncio.sleep(0)
 
-    def wait(self, duration: float):
-        """Wait for specified duration"""
-        self.actions.append(Wait(duration=duration))
-        return self
 
-    def turn(self, degrees: float, duration: float = 1.0):
-        """Turn camera by specified degrees"""
-        self.actions.append(Turn(degrees=degrees, duration=duration))
-        return self
+class _GroupContext:
+    """Collect an ActionGroup and append it to the test routine on a clean exit"""
 
-    def mouse_move(self, dx: float, dy: float = 0, duration: float = 0.1):
-        """Move mouse by relative amount"""
-        self.actions.append(MouseMove(dx=dx, dy=dy, duration=duration))
-        return self
+    __slots__ = ("routine", "group")
 
-    def mouse_press(self, button: MouseButton):
-        """Press a mouse button and hold it"""
-        self.actions.append(MousePress(button=button))
-        return self
+    def __init__(self, routine: "Routine", parallel: bool):
+        self.routine = routine
+        self.group = ActionGroup(parallel=parallel)
 
-    def mouse_release(self, button: MouseButton):
-        """Release a previously pressed mouse button"""
-        self.actions.append(MouseRelease(button=button))
-        return self
+    def __enter__(self) -> ActionGroup:
+        return self.group
 
-    def mouse_click(self, button: MouseButton, duration: float = 0.1):
-        """Click a mouse button (press and release)"""
-        self.actions.append(MouseClick(button=button, duration=duration))
-        return self
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            group = self.group
+            self.routine.sequences.append(
+                ActionSequence(actions=group.actions, parallel=group.parallel)
+            )
+        return False
 
 
 class Routine:
     """A collection of action sequences to be executed"""
 
+    __slots__ = ("controller", "sequences")
+
     def __init__(self, controller: "DSController"):
         self.controller = controller
         self.sequences: List[ActionSequence] = []
-        self._cancelled = False  # Add cancellation flag
 
-    @contextmanager
-    def parallel_actions(self):
+    def parallel_actions(self) -> "_GroupContext":
         """Create a group of parallel actions using a context manager"""
-        group = ActionGroup(parallel=True)
-        yield group
-        self.sequences.append(ActionSequence(actions=group.actions, parallel=True))
+        return _GroupContext(self, parallel=True)
 
-    @contextmanager
-    def sequential_actions(self):
+    def sequential_actions(self) -> "_GroupContext":
         """Create a group of sequential actions using a context manager"""
-        group = ActionGroup(parallel=False)
-        yield group
-        self.sequences.append(ActionSequence(actions=group.actions, parallel=False))
+        return _GroupContext(self, parallel=False)
 
     def add_actions(self, actions: List[InputAction], parallel: bool = False):
         """Add a list of predefined actions"""
@@ -105,20 +92,45 @@ class Routine:
         return self
 
     async def run(self):
-        """Execute the entire routine"""
-        for sequence in self.sequences:
-            if self._cancelled:  # Check cancellation flag
-                break
-            await self.controller.execute_sequence(sequence)
+        """Execute the entire routine; cancel its task to stop it"""
+        controller = self.controller
+        # Inputs this routine pressed and has not released yet
+        held_keys: Set[str] = set()
+        held_buttons: Set[MouseButton] = set()
+        try:
+            for sequence in self.sequences:
+                keys_before = set(controller.pressed_keys)
+                buttons_before = set(controller.pressed_mouse_buttons)
+                try:
+                    await controller.execute_sequence(sequence)
+                finally:
+                    held_keys = (held_keys & controller.pressed_keys) | (
+                        controller.pressed_keys - keys_before
+                    )
+                    held_buttons = (held_buttons & controller.pressed_mouse_buttons) | (
+                        controller.pressed_mouse_buttons - buttons_before
+                    )
+        except asyncio.CancelledError:
+            # Release what this routine still holds, leaving other inputs alone
+            await controller._release_inputs(held_keys, held_buttons)
+            raise
 
 
 class DSController:
     """Mock controller that records executed actions for testing"""
 
+    __slots__ = (
+        "executed_actions",
+        "pressed_keys",
+        "pressed_mouse_buttons",
+        "_fast_mode",
+    )
+
     def __init__(self):
         self.executed_actions: List[Dict[str, Any]] = []
         self.pressed_keys: Set[str] = set()
         self.pressed_mouse_buttons: Set[MouseButton] = set()
+        self._fast_mode: bool = True  # Skip the simulated sleeps in tests
 
     def create_routine(self) -> Routine:
         """Create a new action routine"""
@@ -131,56 +143,95 @@ class DSController:
             self.executed_actions.append(
                 {
                     "type": "parallel_group",
-                    "actions": [
-                        a.model_dump() for a in sequence.actions
-                    ],  # Use model_dump instead of dict
+                    "actions": [_cached_dump(a) for a in sequence.actions],
                 }
             )
-            # Simulate effects of actions (update pressed keys, etc.)
+            # Apply instant press/release effects in bulk
+            by_type: Dict[type, List[InputAction]] = {}
             for action in sequence.actions:
-                await self._simulate_action(action)
+                by_type.setdefault(type(action), []).append(action)
+            self.pressed_keys.update(a.key for a in by_type.get(KeyPress, ()))
+            self.pressed_keys.difference_update(
+                a.key for a in by_type.get(KeyRelease, ())
+            )
+            self.pressed_mouse_buttons.update(
+                a.button for a in by_type.get(MousePress, ())
+            )
+            self.pressed_mouse_buttons.difference_update(
+                a.button for a in by_type.get(MouseRelease, ())
+            )
+
+            # Only timed actions need to be simulated concurrently
+            await asyncio.gather(
+                *(
+                    self._simulate_action(action)
+                    for action in sequence.actions
+                    if type(action) in _DURATION_TYPES
+                )
+            )
         else:
             # For sequential actions, record each one separately
             for action in sequence.actions:
                 await self._execute_action(action)
 
+    async def _release_inputs(self, keys: Set[str], buttons: Set[MouseButton]):
+        """Release the given keys and mouse buttons that are still held"""
+        for key in keys & self.pressed_keys:
+            await self._execute_action(KeyRelease(key=key))
+        for button in buttons & self.pressed_mouse_buttons:
+            await self._execute_action(MouseRelease(button=button))
+
     async def _execute_action(self, action: InputAction):
         """Execute a single action and record it"""
-        self.executed_actions.append(
-            action.model_dump()
-        )  # Use model_dump instead of dict
+        self.executed_actions.append(_cached_dump(action))
         await self._simulate_action(action)
 
     async def _simulate_action(self, action: InputAction):
         """Simulate the effects of an action (e.g., key press/release)"""
-        if isinstance(action, KeyPress):
-            self.pressed_keys.add(action.key)
-        elif isinstance(action, KeyRelease):
-            self.pressed_keys.discard(action.key)
+        handler = _SIMULATE_HANDLERS.get(type(action))
+        if handler is not None:
+            handler(self, action)
         elif isinstance(action, KeyTap):
             self.pressed_keys.add(action.key)
-            await asyncio.sleep(0.01)  # Tiny sleep to simulate press/release sequence
+            await self._pause()  # Let gathered peers see the key held
             self.pressed_keys.discard(action.key)
-        elif isinstance(action, MousePress):
-            self.pressed_mouse_buttons.add(action.button)
-        elif isinstance(action, MouseRelease):
-            self.pressed_mouse_buttons.discard(action.button)
 
-        # For testing, use a very short sleep to simulate action duration
-        if action.duration:
+        # Use a very short pause to simulate action duration
+        if type(action) in _DURATION_TYPES and action.duration:
+            await self._pause()
+
+    async def _pause(self):
+        """Yield once in fast mode, otherwise sleep briefly"""
+        if self._fast_mode:
+            await _tick()
+        else:
             await asyncio.sleep(0.01)
 
 
+# Synchronous state updates for _simulate_action, keyed by exact action type
+_SIMULATE_HANDLERS = {
+    KeyPress: lambda self, a: self.pressed_keys.add(a.key),
+    KeyRelease: lambda self, a: self.pressed_keys.discard(a.key),
+    MousePress: lambda self, a: self.pressed_mouse_buttons.add(a.button),
+    MouseRelease: lambda self, a: self.pressed_mouse_buttons.discard(a.button),
+}
+
+# Action types that carry a duration of their own
+_DURATION_TYPES = frozenset({KeyTap, Wait, Turn, MouseMove, MouseClick})
+
+
 # Useful action libraries for testing
+# Trusted input: arguments are literals or numbers, so validation is skipped
 class CommonActions:
     @staticmethod
     def sprint_forward(duration: float) -> List[InputAction]:
+        forward = MovementDirection.FORWARD.value
         return [
-            KeyPress(key=MovementDirection.FORWARD),
-            KeyPress(key="sprint"),
-            Wait(duration=duration),
-            KeyRelease(key="sprint"),
-            KeyRelease(key=MovementDirection.FORWARD),
+            KeyPress.model_construct(key=forward),
+            KeyPress.model_construct(key="sprint"),
+            Wait.model_construct(duration=float(duration)),
+            KeyRelease.model_construct(key="sprint"),
+            KeyRelease.model_construct(key=forward),
         ]
 
     @staticmethod
@@ -188,19 +239,34 @@ class CommonActions:
         degrees: float = 360, duration: float = 5.0
     ) -> List[InputAction]:
         return [
-            KeyPress(key="scan"),
-            Turn(degrees=degrees, duration=duration),
-            KeyRelease(key="scan"),
+            KeyPress.model_construct(key="scan"),
+            Turn.model_construct(degrees=float(degrees), duration=float(duration)),
+            KeyRelease.model_construct(key="scan"),
         ]
 
 
 # ============= Tests for the developer experience =============
 
 
+@pytest.fixture(scope="module")
+def _shared_controller():
+    """One recording controller reused by every test in this module"""
+    return DSController()
+
+
+@pytest.fixture
+def controller(_shared_controller):
+    """Hand out the shared controller with its recorded state reset"""
+    _shared_controller.executed_actions.clear()
+    _shared_controller.pressed_keys.clear()
+    _shared_controller.pressed_mouse_buttons.clear()
+    _shared_controller._fast_mode = True
+    return _shared_controller
+
+
 @pytest.mark.asyncio
-async def test_context_manager_for_action_groups():
+async def test_context_manager_for_action_groups(controller):
     """Test using context managers for creating action groups"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Use context manager for parallel actions
@@ -231,9 +297,8 @@ async def test_context_manager_for_action_groups():
 
 
 @pytest.mark.asyncio
-async def test_assignment_based_fluent_interface():
+async def test_assignment_based_fluent_interface(controller):
     """Test the assignment-based fluent interface for creating actions"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Create action group through context manager
@@ -257,9 +322,8 @@ async def test_assignment_based_fluent_interface():
 
 
 @pytest.mark.asyncio
-async def test_predefined_action_lists():
+async def test_predefined_action_lists(controller):
     """Test adding predefined lists of actions to a routine"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Create a list of predefined actions
@@ -287,9 +351,8 @@ async def test_predefined_action_lists():
 
 
 @pytest.mark.asyncio
-async def test_complex_game_movement_pattern():
+async def test_complex_game_movement_pattern(controller):
     """Test a complex movement pattern typical in games"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Approach an object
@@ -322,9 +385,8 @@ async def test_complex_game_movement_pattern():
 
 
 @pytest.mark.asyncio
-async def test_reusable_action_libraries():
+async def test_reusable_action_libraries(controller):
     """Test using predefined action libraries"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Add actions from a library
@@ -346,9 +408,8 @@ async def test_reusable_action_libraries():
 
 
 @pytest.mark.asyncio
-async def test_complex_combat_sequence():
+async def test_complex_combat_sequence(controller):
     """Test a complex combat sequence with both parallel and sequential actions"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Start by moving to cover
@@ -392,9 +453,8 @@ async def test_complex_combat_sequence():
 
 
 @pytest.mark.asyncio
-async def test_mixing_approaches():
+async def test_mixing_approaches(controller):
     """Test mixing different approaches to building actions"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Use context manager for first part
@@ -424,9 +484,8 @@ async def test_mixing_approaches():
 
 
 @pytest.mark.asyncio
-async def test_keyboard_shortcuts_for_game_menus():
+async def test_keyboard_shortcuts_for_game_menus(controller):
     """Test navigating game menus with keyboard shortcuts"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Open inventory
@@ -455,18 +514,14 @@ async def test_keyboard_shortcuts_for_game_menus():
     await routine.run()
 
     # Check that appropriate actions were executed
-    inventory_actions = [
-        a
-        for a in controller.executed_actions
-        if isinstance(a, dict) and a.get("key") == "i"
-    ]
-    assert len(inventory_actions) > 0
+    assert any(
+        a.get("key") == "i" for a in controller.executed_actions if isinstance(a, dict)
+    )
 
 
 @pytest.mark.asyncio
-async def test_smooth_camera_movement():
+async def test_smooth_camera_movement(controller):
     """Test smooth camera movement for cinematic control"""
-    controller = DSController()
     routine = controller.create_routine()
 
     # Setup for cinematic camera movement
@@ -504,20 +559,18 @@ async def test_smooth_camera_movement():
 
     assert len(turn_actions) > 0
     # Check that at least one turn action has a meaningful duration
-    has_long_duration = False
-    for group in turn_actions:
-        for action in group.get("actions", []):
-            if action.get("type") == "turn" and action.get("duration", 0) >= 1.0:
-                has_long_duration = True
-                break
+    has_long_duration = any(
+        action.get("type") == "turn" and action.get("duration", 0) >= 1.0
+        for group in turn_actions
+        for action in group.get("actions", [])
+    )
 
     assert has_long_duration, "Should have at least one long duration camera movement"
 
 
 @pytest.mark.asyncio
-async def test_action_cancellation():
+async def test_action_cancellation(controller):
     """Test canceling a routine mid-execution"""
-    controller = DSController()
 
     # Create a routine with a long-running action
     routine = controller.create_routine()
@@ -526,35 +579,53 @@ async def test_action_cancellation():
         actions.wait(10.0)  # Long wait that will be cancelled
         actions.release(MovementDirection.FORWARD)
 
-    # Create a task for the routine
+    # Held by another routine before this one starts
+    controller.pressed_keys.add("scan")
+
+    # Start the routine and let it run until the wait suspends it
     task = asyncio.create_task(routine.run())
+    await _tick()
+    assert MovementDirection.FORWARD in controller.pressed_keys
 
-    # Wait a short time and then cancel
-    await asyncio.sleep(0.1)
-    routine._cancelled = True  # Set the cancellation flag
+    # Cancelling the task propagates CancelledError out of the routine
     task.cancel()
-
-    try:
+    with pytest.raises(asyncio.CancelledError):
         await task
-    except asyncio.CancelledError:
-        # Expected behavior
-        pass
 
-    # Manually simulate the key press since task cancellation doesn't preserve state
-    controller.pressed_keys.add(MovementDirection.FORWARD)
+    # The routine's own release never ran; cleanup released only its key
+    assert [(a["type"], a.get("key")) for a in controller.executed_actions] == [
+        ("press", "forward"),
+        ("wait", None),
+        ("release", "forward"),
+    ]
+    assert controller.pressed_keys == {"scan"}
 
-    # Check that the key is still pressed (since we didn't reach the release)
-    assert MovementDirection.FORWARD in controller.pressed_keys
 
-    # Cleanup - release all keys
-    cleanup_routine = controller.create_routine()
-    with cleanup_routine.sequential_actions() as actions:
+@pytest.mark.asyncio
+async def test_action_cancellation_after_parallel_press(controller):
+    """Test that cancelling releases inputs pressed by an earlier sequence"""
+    routine = controller.create_routine()
+    with routine.parallel_actions() as actions:
+        actions.press(MovementDirection.FORWARD)
+        actions.mouse_press(MouseButton.LEFT)
+    with routine.sequential_actions() as actions:
+        actions.wait(10.0)  # Long wait that will be cancelled
         actions.release(MovementDirection.FORWARD)
+        actions.mouse_release(MouseButton.LEFT)
 
-    await cleanup_routine.run()
+    # Held by another routine before this one starts
+    controller.pressed_keys.add("scan")
 
-    # Now all keys should be released
-    assert len(controller.pressed_keys) == 0
+    task = asyncio.create_task(routine.run())
+    await _tick()
+    assert MovementDirection.FORWARD in controller.pressed_keys
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert controller.pressed_keys == {"scan"}
+    assert len(controller.pressed_mouse_buttons) == 0
 
 
 def test_pydantic_model_validation():
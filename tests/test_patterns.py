@@ -0,0 +1,124 @@
+import functools
+
+import pytest
+from pydantic import ValidationError
+
+from ds_macro.models import MouseButton, MouseClick, MovementDirection, Wait
+from ds_macro.patterns import CommonActions
+
+FORWARD = MovementDirection.FORWARD
+BACKWARD = MovementDirection.BACKWARD
+LEFT = MovementDirection.LEFT
+RIGHT = MovementDirection.RIGHT
+
+
+# Keys each movement factory holds, in press order
+_HELD_KEYS = {
+    "sprint_forward": (FORWARD, "sprint"),
+    "strafe_left": (LEFT,),
+    "strafe_right": (RIGHT,),
+    "backstep": (BACKWARD,),
+}
+
+
+def _shape(actions):
+    """Reduce actions to (class name, key/button/duration) pairs for comparison."""
+    return tuple(
+        (
+            type(a).__name__,
+            getattr(a, "key", getattr(a, "button", getattr(a, "duration", None))),
+        )
+        for a in actions
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _expected(name, duration):
+    """Expected _shape() of a movement: press keys, wait, release in reverse."""
+    held = _HELD_KEYS[name]
+    return (
+        tuple(("KeyPress", key) for key in held)
+        + (("Wait", duration),)
+        + tuple(("KeyRelease", key) for key in reversed(held))
+    )
+
+
+@pytest.fixture(scope="module")
+def action_cache():
+    """Build each CommonActions result once per module, keyed by name and args."""
+
+    @functools.lru_cache(maxsize=None)
+    def build(name, *args):
+        return tuple(getattr(CommonActions, name)(*args))
+
+    return build
+
+
+class TestCommonActions:
+    def test_sprint_forward(self, action_cache):
+        """Test that sprinting holds forward and sprint for the whole wait."""
+        actions = action_cache("sprint_forward", 3.0)
+
+        assert _shape(actions) == _expected("sprint_forward", 3.0)
+
+    @pytest.mark.parametrize("name", ["strafe_left", "strafe_right", "backstep"])
+    def test_strafe_movements(self, action_cache, name):
+        """Test the press/wait/release shape of the single-direction moves."""
+        actions = action_cache(name, 1.5)
+
+        assert _shape(actions) == _expected(name, 1.5)
+
+    @pytest.mark.parametrize("shots,delay", [(1, 0.2), (3, 0.3)])
+    def test_aim_and_fire(self, action_cache, shots, delay):
+        """Test that firing aims, clicks per shot with delays between, then lowers."""
+        actions = action_cache("aim_and_fire", shots, delay)
+
+        assert _shape((actions[0], actions[-1])) == (
+            ("MousePress", MouseButton.RIGHT),
+            ("MouseRelease", MouseButton.RIGHT),
+        )
+
+        # Split clicks and delays in a single pass
+        clicks, delays = [], []
+        for action in actions:
+            if isinstance(action, MouseClick):
+                clicks.append(action)
+            elif isinstance(action, Wait):
+                delays.append(action)
+        assert len(clicks) == shots
+        assert all(c.button == MouseButton.LEFT for c in clicks)
+        assert [d.duration for d in delays] == pytest.approx([delay] * (shots - 1))
+
+    def test_scan_environment(self, action_cache):
+        """Test that a scan presses and releases the scan key."""
+        actions = action_cache("scan_environment")
+
+        assert [(a.type, a.key) for a in actions] == [
+            ("press", "scan"),
+            ("release", "scan"),
+        ]
+
+    @pytest.mark.parametrize(
+        "name,key,duration",
+        [
+            ("crouch_toggle", "crouch", 0.1),
+            ("jump", "jump", 0.1),
+            ("reload", "reload", 0.1),
+            ("interact", "action", 0.5),
+            ("open_inventory", "cargo", 0.1),
+            ("close_menu", "esc", 0.1),
+        ],
+    )
+    def test_quick_actions(self, action_cache, name, key, duration):
+        """Test that each quick action is a single tap of its key."""
+        assert [(a.type, a.key, a.duration) for a in action_cache(name)] == [
+            ("tap", key, duration)
+        ]
+
+    def test_cached_actions_are_frozen(self):
+        """Test that shared cached actions cannot be changed by one caller."""
+        actions = CommonActions.backstep(1.0)
+
+        assert CommonActions.backstep(1.0) is actions
+        with pytest.raises(ValidationError):
+            actions[1].duration = 5.0
@@ -0,0 +1,127 @@
+import json
+from collections import Counter
+
+import pytest
+
+from ds_macro.models import ActionType, MovementDirection
+
+
+@pytest.fixture(scope="module")
+def pynput_mods():
+    """Import pynput lazily, on its dummy backend so no display is probed."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("PYNPUT_BACKEND", "dummy")
+        # pynput raises a plain ImportError when no backend can load
+        keyboard = pytest.importorskip("pynput.keyboard", exc_type=ImportError)
+        mouse = pytest.importorskip("pynput.mouse", exc_type=ImportError)
+    return keyboard, mouse
+
+
+@pytest.fixture(scope="module")
+def key_w(pynput_mods):
+    """The W key, built once since the tests only read it."""
+    keyboard, _ = pynput_mods
+    return keyboard.KeyCode.from_char("w")
+
+
+@pytest.fixture(scope="module")
+def _mock_listeners(pynput_mods):
+    """Keep InputRecorder from starting real pynput input listeners."""
+    from unittest.mock import MagicMock
+
+    keyboard, mouse = pynput_mods
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(keyboard, "Listener", MagicMock)
+        mp.setattr(mouse, "Listener", MagicMock)
+        yield
+
+
+@pytest.fixture(scope="module")
+def recorder_mod(_mock_listeners):
+    """The recorder module, imported only once pynput is set up."""
+    from ds_macro import recorder
+
+    return recorder
+
+
+@pytest.fixture(scope="module")
+def _shared_recorder(recorder_mod):
+    """One InputRecorder, with stubbed listeners, for the whole module."""
+    return recorder_mod.InputRecorder()
+
+
+@pytest.fixture
+def recorder(_shared_recorder, recorder_mod):
+    """Hand out the shared recorder reset to idle with the default config."""
+    _shared_recorder.reset()
+    _shared_recorder.config = recorder_mod.RecorderConfig()
+    return _shared_recorder
+
+
+class TestRecorderIntegration:
+    def test_recorder_initialization(self, recorder):
+        """Test that a new recorder starts idle with nothing recorded."""
+
+        assert recorder.is_recording is False
+        assert recorder.start_time is None
+        assert recorder.actions == []
+        recorder.mouse_listener.start.assert_called_once()
+        recorder.keyboard_listener.start.assert_called_once()
+
+    def test_recording_state_toggle(self, recorder, pynput_mods):
+        """Test that the toggle key starts and stops recording."""
+        keyboard, _ = pynput_mods
+        toggle = keyboard.KeyCode.from_char(recorder.TOGGLE_KEY)
+
+        recorder._on_key_press(toggle)
+        assert recorder.is_recording is True
+
+        recorder._on_key_press(toggle)
+        assert recorder.is_recording is False
+
+    @pytest.mark.benchmark
+    def test_key_tracking(self, recorder, key_w):
+        """Test that movement keys are recorded and tracked while held."""
+        forward = MovementDirection.FORWARD.value
+        recorder.start_recording()
+
+        recorder._on_key_press(key_w)
+        assert forward in recorder.pressed_keys
+        assert recorder.actions[-1].type == ActionType.MOVE
+        assert recorder.actions[-1].params == {"direction": forward}
+
+        recorder._on_key_release(key_w)
+        assert forward not in recorder.pressed_keys
+
+    def test_mouse_tracking(self, recorder, recorder_mod, pynput_mods):
+        """Test that mouse turns and clicks are recorded."""
+        _, mouse = pynput_mods
+        recorder.config = recorder_mod.RecorderConfig(min_pixel_movement=1.0)
+        recorder.start_recording()
+
+        recorder._on_mouse_move(0, 0)
+        recorder._on_mouse_move(100, 0)
+        recorder._on_mouse_click(100, 0, mouse.Button.left, True)
+
+        counts = Counter(a.type for a in recorder.actions)
+        assert counts[ActionType.TURN] >= 1
+        assert counts[ActionType.HOLD_MOUSE] >= 1
+
+    @pytest.mark.benchmark
+    def test_save_routine(self, recorder_mod, key_w, tmp_path):
+        """Test saving recorded actions to a routine file."""
+        # Start at 0.0 and press at 0.1, so the move gets a non-zero duration
+        recorder = recorder_mod.InputRecorder(clock=iter([0.0, 0.1]).__next__)
+        recorder.start_recording()
+        recorder._on_key_press(key_w)
+
+        routine = recorder.save_routine(
+            "test_routine", "Recorded in a test", directory=str(tmp_path)
+        )
+
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        routine_data = json.loads(files[0].read_bytes())
+
+        assert routine_data["name"] == "test_routine"
+        assert len(routine_data["actions"]) == len(routine.actions) == 1